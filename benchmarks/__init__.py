@@ -0,0 +1,9 @@
+"""Benchmarks of glob2 against the stdlib ``glob`` and ``pathlib``.
+
+Run them with::
+
+    python -m benchmarks --scale 0.1 --output results.jsonl
+
+and compare the JSON-lines output across commits (on Python 3.5+,
+for the recursive stdlib ``glob``).
+"""
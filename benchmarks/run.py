@@ -0,0 +1,215 @@
+"""Run the pattern matrix on the synthetic trees, for every engine."""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import glob2
+
+from .trees import SHAPES, count_entries, make_tree
+
+
+PATTERNS = (
+    '*.py',
+    '*/*.txt',
+    '**/*.py',
+    '**/dir0001/*',
+    '*/**/file000?.*',
+    '**',
+)
+
+
+def _glob2(pattern, stats=None):
+    return glob2.iglob(pattern, stats=stats)
+
+
+def _glob2_sorted(pattern, stats=None):
+    return glob2.iglob(pattern, sort=True, stats=stats)
+
+
+def _stdlib(pattern, stats=None):
+    return glob.iglob(pattern, recursive=True)
+
+
+def _pathlib(pattern, stats=None):
+    # pathlib's trailing '**' matches directories only, where glob2's matches
+    # everything below: translate it, so both do the same work.
+    if pattern == '**' or pattern.endswith('/**'):
+        pattern += '/*'
+    if pattern.startswith('**/'):
+        return pathlib.Path().rglob(pattern[3:])
+    return pathlib.Path().glob(pattern)
+
+
+ENGINES = {
+    'glob2': _glob2,
+    'glob2-sorted': _glob2_sorted,
+    'glob': _stdlib,
+    'pathlib': _pathlib,
+}
+
+#: The `os` functions all engines end up calling, counted by :func:`counting_os`.
+COUNTED_CALLS = ('scandir', 'listdir', 'stat', 'lstat')
+
+#: glob2 binds ``os.listdir`` at import time, so it is counted by its
+#: :class:`glob2.GlobStats` instead; its ``os.path`` methods look up the
+#: patched ``os.stat`` & ``os.lstat`` at call time, already counted.
+GLOB2_CALLS = {
+    'listdir': 'listdir',
+}
+
+
+@contextlib.contextmanager
+def counting_os():
+    """Patch the filesystem calls of `os`, to count them in the yielded dict."""
+    counts = dict.fromkeys(COUNTED_CALLS, 0)
+    # os.scandir() is missing before Python 3.5.
+    originals = {name: getattr(os, name) for name in COUNTED_CALLS
+                 if hasattr(os, name)}
+
+    def counting(name, func):
+        def wrapper(*args, **kw):
+            counts[name] += 1
+            return func(*args, **kw)
+        return wrapper
+
+    for name, func in originals.items():
+        setattr(os, name, counting(name, func))
+    try:
+        yield counts
+    finally:
+        for name, func in originals.items():
+            setattr(os, name, func)
+
+
+def _consume(results):
+    n = 0
+    for _ in results:
+        n += 1
+    return n
+
+
+def results(engine, pattern):
+    """Return the set of normalized paths `engine` finds for `pattern`."""
+    return {os.path.normpath(str(p)) for p in ENGINES[engine](pattern)}
+
+
+def measure(engine, pattern, repeat):
+    """Return the metrics of globbing `pattern` in the current directory."""
+    func = ENGINES[engine]
+
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n = _consume(func(pattern))
+        wall_times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        _consume(func(pattern))
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = glob2.GlobStats()
+    with counting_os() as calls:
+        _consume(func(pattern, stats))
+    for name, call in GLOB2_CALLS.items():
+        calls[call] += stats.calls[name]
+
+    return {
+        'results': n,
+        'wall_time': min(wall_times),
+        'peak_memory': peak_memory,
+        'calls': calls,
+    }
+
+
+def _git_commit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        out = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=here,
+                                      stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode('ascii').strip()
+
+
+def run(root, shapes, engines, patterns, scale=1.0, seed=0, repeat=3):
+    """Yield a record (dict) for every shape/pattern/engine combination."""
+    common = {
+        'commit': _git_commit(),
+        'glob2': '.'.join(map(str, glob2.__version__)),
+        'python': platform.python_version(),
+        'platform': sys.platform,
+        'scale': scale,
+        'seed': seed,
+    }
+    cwd = os.getcwd()
+    for shape in shapes:
+        top = make_tree(root, shape, scale, seed)
+        entries = count_entries(top)
+        os.chdir(top)
+        try:
+            for pattern in patterns:
+                # Engines differ on hidden files, symlinks & co: flag the
+                # records not finding the same paths as glob2.
+                expected = results('glob2', pattern)
+                for engine in engines:
+                    record = dict(common, shape=shape, entries=entries,
+                                  pattern=pattern, engine=engine)
+                    record.update(measure(engine, pattern, repeat))
+                    record['comparable'] = results(engine, pattern) == expected
+                    yield record
+        finally:
+            os.chdir(cwd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__)
+    parser.add_argument(
+        '--root', default=os.path.join(tempfile.gettempdir(), 'glob2-bench'),
+        help="where to generate (and reuse) the trees [default: %(default)s]")
+    parser.add_argument(
+        '--shapes', default=','.join(sorted(SHAPES)),
+        help="comma-separated tree shapes [default: %(default)s]")
+    parser.add_argument(
+        '--engines', default=','.join(sorted(ENGINES)),
+        help="comma-separated engines [default: %(default)s]")
+    parser.add_argument(
+        '--pattern', action='append', dest='patterns',
+        help="a pattern to run (repeatable) [default: the built-in matrix]")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="multiply tree fan-outs [default: %(default)s]")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="timed runs, the fastest kept [default: %(default)s]")
+    parser.add_argument('--output', '-o', type=argparse.FileType('w'),
+                        default=sys.stdout, help="JSON-lines file [default: stdout]")
+    args = parser.parse_args(argv)
+
+    shapes = args.shapes.split(',')
+    engines = args.engines.split(',')
+    for name, known in (('shape', SHAPES), ('engine', ENGINES)):
+        unknown = set(shapes if name == 'shape' else engines) - set(known)
+        if unknown:
+            parser.error('unknown %s(s): %s' % (name, ', '.join(sorted(unknown))))
+
+    for record in run(args.root, shapes, engines, args.patterns or PATTERNS,
+                      args.scale, args.seed, args.repeat):
+        args.output.write(json.dumps(record, sort_keys=True) + '\n')
+        args.output.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Reproducible synthetic directory trees to glob on."""
+
+import json
+import os
+import random
+import shutil
+
+
+#: name --> (depth, subdirs-per-dir, files-per-dir, hidden-ratio, symlink-ratio)
+SHAPES = {
+    'wide': (1, 50, 400, 0.0, 0.0),
+    'deep': (12, 2, 4, 0.0, 0.0),
+    'hidden': (3, 8, 40, 0.5, 0.0),
+    'symlinks': (3, 8, 40, 0.0, 0.3),
+    'huge': (3, 40, 16, 0.05, 0.0),  # ~1.1M entries at scale=1
+}
+
+EXTENSIONS = ('.py', '.txt', '.h', '.c', '.json', '.parquet')
+
+
+def _scaled(n, scale):
+    return max(1, int(round(n * scale)))
+
+
+def make_tree(root, shape, scale=1.0, seed=0):
+    """Create (or reuse) the `shape` tree under `root`, and return its path.
+
+    The same arguments always produce the same tree; a marker file next
+    to it records them, so an existing tree is reused only if it matches.
+    """
+    depth, subdirs, files, hidden, symlinks = SHAPES[shape]
+    subdirs, files = _scaled(subdirs, scale), _scaled(files, scale)
+    top = os.path.join(root, '%s-%s-%s' % (shape, scale, seed))
+    marker = top + '.json'  # outside the tree, not to be globbed
+    spec = {'shape': shape, 'scale': scale, 'seed': seed}
+    if os.path.exists(marker) and os.path.isdir(top):
+        with open(marker) as fp:
+            if json.load(fp) == spec:
+                return top
+    if os.path.exists(top):
+        shutil.rmtree(top)
+
+    rnd = random.Random(seed)
+    dirs, leaves = [], []
+
+    def name(prefix, i):
+        dot = '.' if rnd.random() < hidden else ''
+        return '%s%s%04d' % (dot, prefix, i)
+
+    def populate(path, level):
+        os.makedirs(path)
+        (dirs if level < depth else leaves).append(path)
+        for i in range(files):
+            ext = rnd.choice(EXTENSIONS)
+            open(os.path.join(path, name('file', i) + ext), 'w').close()
+        if level < depth:
+            for i in range(subdirs):
+                populate(os.path.join(path, name('dir', i)), level + 1)
+
+    populate(top, 0)
+
+    if symlinks:
+        # Link only to leaf directories, holding no links, so there are no cycles.
+        for path in dirs:
+            for i in range(subdirs):
+                if rnd.random() < symlinks:
+                    os.symlink(rnd.choice(leaves),
+                               os.path.join(path, 'link%04d' % i))
+
+    with open(marker, 'w') as fp:
+        json.dump(spec, fp)
+    return top
+
+
+def count_entries(top):
+    return sum(len(dirnames) + len(filenames)
+               for _, dirnames, filenames in os.walk(top))
@@ -0,0 +1,109 @@
+"""Stream the paths matching glob patterns, e.g. as ``find ... -print0``.
+
+Usage::
+
+    glob2 -0 'src/**/*.py' -x '*_test.py' | xargs -0 wc -l
+"""
+
+from __future__ import absolute_import
+
+import argparse
+from itertools import islice
+import os
+import sys
+
+from .impl import GlobStats, Globber
+
+
+fsencode = getattr(os, 'fsencode', lambda s: s)
+_seps = [fsencode(s) for s in (os.sep, os.altsep) if s]
+
+
+def _excluder(globber, patterns):
+    """Return a predicate telling whether a path matches any of the `patterns`.
+
+    Patterns without a separator are matched against the basename of the path
+    (like ``find -name``), the rest against the whole path.
+    """
+    name_pats = [p for p in patterns if not any(s in p for s in _seps)]
+    path_pats = [p for p in patterns if p not in name_pats]
+    strip = b''.join(_seps)
+
+    def excluded(path):
+        if name_pats:
+            name = os.path.basename(path.rstrip(strip))
+            if any(globber.fnmatch(name, pat) for pat in name_pats):
+                return True
+        return any(globber.fnmatch(path, pat) for pat in path_pats)
+    return excluded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='glob2', description=__doc__.splitlines()[0])
+    parser.add_argument('patterns', nargs='+', metavar='PATTERN',
+                        help="glob pattern, ``**`` matching any directories")
+    parser.add_argument('-0', '--null', action='store_true',
+                        help="separate paths with NUL instead of newline")
+    parser.add_argument('-x', '--exclude', action='append', default=[],
+                        metavar='PATTERN',
+                        help="skip paths matching it, where ``*`` matches "
+                        "separators too, or their basename, if it contains "
+                        "no separator; repeatable")
+    parser.add_argument('--hidden', action='store_true',
+                        help="let wildcards match names starting with a dot")
+    parser.add_argument('--follow', action='store_true',
+                        help="follow symbolic links for ``**``")
+    parser.add_argument('--sort', action='store_true',
+                        help="sort the paths, component by component")
+    parser.add_argument('--limit', type=int, metavar='N',
+                        help="stop after printing N paths")
+    parser.add_argument('--stats', action='store_true',
+                        help="print counters of the work done on stderr")
+    args = parser.parse_args(argv)
+    if args.limit is not None and args.limit < 0:
+        parser.error("argument --limit: must not be negative")
+
+    globber = Globber(include_hidden=args.hidden, followlinks=args.follow,
+                      sort=args.sort,
+                      stats=GlobStats() if args.stats else None)
+    excluded = args.exclude and _excluder(
+        globber, [fsencode(p) for p in args.exclude])
+
+    # Glob bytes, so undecodable filenames are printed verbatim.
+    def iter_paths():
+        for pattern in args.patterns:
+            for path in globber.iglob(fsencode(pattern)):
+                if not excluded or not excluded(path):
+                    yield path
+
+    paths = iter_paths()
+    if args.limit is not None:
+        paths = islice(paths, args.limit)
+
+    out = getattr(sys.stdout, 'buffer', sys.stdout)
+    end = b'\0' if args.null else b'\n'
+    count = 0
+    try:
+        for path in paths:
+            out.write(path + end)
+            count += 1
+        out.flush()
+    except KeyboardInterrupt:
+        return 130
+    except IOError:  # e.g. the reader of the pipe has exited, like `head`
+        # Python would fail flushing stdout again, on exit.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+    if args.stats:
+        stats = globber.stats.as_dict()
+        stats['results'] = count
+        for key in sorted(stats):
+            sys.stderr.write('%s: %s\n' % (key, stats[key]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
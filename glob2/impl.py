@@ -2,10 +2,13 @@
 
 from __future__ import absolute_import
 
+from array import array
+import heapq
 import os
 from os.path import join
 import re
 import sys
+import time
 
 
 try:
@@ -20,8 +23,11 @@ except ImportError:
 
 
 PY2 = sys.version_info[0] < 3
+_timer = getattr(time, 'perf_counter', time.time)
 magic_check = re.compile('[*?[]')
 magic_check_bytes = re.compile(b'[*?[]')
+_seps = (os.sep, os.altsep) if os.altsep else (os.sep,)
+_seps_bytes = tuple(s.encode('ASCII') for s in _seps)
 
 
 def has_magic(s):
@@ -32,10 +38,47 @@ def has_magic(s):
     return match is not None
 
 
+def _split_literal(pathname):
+    """Split the components following the last magic one off `pathname`.
+
+    :return:
+        ``(head, literal)``, where `literal` is falsy if the last component
+        of `pathname` is magic.  It may end with a separator, if `pathname`
+        does too.
+    """
+    head, parts = pathname, []
+    while True:
+        dirname, basename = os.path.split(head)
+        if has_magic(basename) or dirname == head:
+            break
+        parts.append(basename)
+        head = dirname
+    if not parts or not has_magic(head) or os.path.split(head)[0] == head:
+        # Nothing literal, or a drive/UNC path containing magic chars.
+        return pathname, None
+    parts.reverse()
+    return head, join(*parts)
+
+
 def _ishidden(path):
     return path[0] in ('.', b'.'[0])
 
 
+def _split_path(path):
+    """Return the non-empty components of `path`."""
+    seps = _seps_bytes if isinstance(path, bytes) else _seps
+    for altsep in seps[1:]:
+        path = path.replace(altsep, seps[0])
+    return [p for p in path.split(seps[0]) if p]
+
+
+def natural_key(name):
+    """A sort-key placing ``file2`` before ``file10``; use it as ``sort=natural_key``."""
+    parts = re.split(br'(\d+)' if isinstance(name, bytes) else r'(\d+)', name)
+    parts[1::2] = [int(p) for p in parts[1::2]]
+    return tuple(parts)
+
+
 def translate(pat):
     """Translate a shell PATTERN to a regular expression.
 
@@ -71,7 +114,7 @@ def translate(pat):
                 res = '%s([%s])' % (res, stuff)
         else:
             res = res + re.escape(c)
-    return res + '\Z(?ms)'
+    return '(?ms)' + res + '\\Z'
 
 
 @lru_cache(maxsize=256, typed=True)
@@ -86,6 +129,313 @@ def _compile_pattern(pat, case_sensitive):
     return re.compile(res, flags).match
 
 
+_array_bytes = getattr(array, 'tobytes', None) or array.tostring
+
+
+def _join_parts(parts):
+    return join(*parts)
+
+
+class PathTree(object):
+    """A compact container of paths, sharing their common directory prefixes.
+
+    Every path-component is stored once, as a node in a table of
+    ``(parent-index, name)`` pairs, and full paths are materialized lazily,
+    while iterating.  Results are kept in insertion order, duplicates included,
+    so iterating it yields the same items as the list returned by :func:`glob`.
+
+    Membership (``path in tree``) and :meth:`iter_prefix` compare paths
+    component-wise, so ``a/b`` is "under" ``a`` but ``a-b`` is not.
+    """
+
+    def __init__(self, join=_join_parts, with_matches=False):
+        self._join = join
+        self.with_matches = with_matches
+        self._parents = array('i')
+        self._names = []
+        self._is_result = bytearray()
+        self._count = 0
+        self._groups = [] if with_matches else None
+        self._dirs = {}  # (parent, name) --> node of directory-components
+        self._last_dir = self._last_node = None
+        # The names in the last two directories, to share equal strings.
+        self._seen, self._seen_before = {}, {}
+        self._verbatim = {}  # node --> path, for paths given whole
+        self._scanned = None  # (parent, {name: [nodes]}), of the last query
+
+    def _new_node(self, parent, name):
+        self._parents.append(parent)
+        self._names.append(name)
+        self._is_result.append(0)
+        return len(self._names) - 1
+
+    def _dir_node(self, dirname):
+        if not dirname:
+            return -1
+        head, tail = os.path.split(dirname)
+        if not tail:
+            if head == dirname:  # the root, or a drive
+                return self._subdir_node(-1, dirname)
+            return self._dir_node(head)  # a trailing slash
+        return self._subdir_node(self._dir_node(head), tail)
+
+    def _subdir_node(self, parent, name):
+        key = (parent, name)
+        node = self._dirs.get(key)
+        if node is None:
+            node = self._dirs[key] = self._new_node(parent, name)
+        return node
+
+    def _find_dir(self, dirname):
+        """Like :meth:`_dir_node`, but return None if missing, creating nothing."""
+        if not dirname:
+            return -1
+        head, tail = os.path.split(dirname)
+        if not tail:
+            if head == dirname:  # the root, or a drive
+                return self._dirs.get((-1, dirname))
+            return self._find_dir(head)  # a trailing slash
+        parent = self._find_dir(head)
+        return None if parent is None else self._dirs.get((parent, tail))
+
+    def _children_named(self, parent, name):
+        """Return the nodes under `parent` named `name`, directories & results.
+
+        Only directories are indexed, so the children of the last `parent`
+        queried are found by scanning the parents' table, and kept.
+        """
+        if self._scanned is None or self._scanned[0] != parent:
+            names = self._names
+            children = {}
+            # Search the packed table, at C speed, for aligned matches.
+            size = self._parents.itemsize
+            table = _array_bytes(self._parents)
+            needle = _array_bytes(array('i', [parent]))
+            i = table.find(needle)
+            while i >= 0:
+                if i % size:
+                    i = table.find(needle, i + 1)
+                    continue
+                node = i // size
+                children.setdefault(names[node], []).append(node)
+                i = table.find(needle, i + size)
+            self._scanned = (parent, children)
+        return self._scanned[1].get(name, [])
+
+    def add(self, dirname, name, groups=()):
+        """Append the result ``join(dirname, name)``; `name` may contain separators.
+
+        If `dirname` is None, `name` is a whole path, yielded back verbatim.
+        """
+        self._scanned = None
+        head, tail = os.path.split(name)
+        # Results mostly come listing after listing of the same directory.
+        if (dirname, head) == self._last_dir:
+            parent = self._last_node
+        elif dirname is None:
+            parent = self._dir_node(head)
+            self._last_dir, self._last_node = (dirname, head), parent
+            self._seen, self._seen_before = {}, self._seen
+        else:
+            parent = self._dir_node(dirname)
+            for part in _split_path(head):
+                parent = self._subdir_node(parent, part)
+            self._last_dir, self._last_node = (dirname, head), parent
+            self._seen, self._seen_before = {}, self._seen
+        # Sibling directories often hold the same names (``part-0000.csv``).
+        tail = self._seen_before.get(tail, tail)
+        self._seen[tail] = tail
+        node = self._new_node(parent, tail)
+        self._is_result[node] = 1
+        self._count += 1
+        if dirname is None:
+            self._verbatim[node] = name
+        if self._groups is not None:
+            self._groups.append(groups)
+
+    def _path(self, node):
+        names = self._names
+        parents = self._parents
+        parts = []
+        while node >= 0:
+            parts.append(names[node])
+            node = parents[node]
+        parts.reverse()
+        return self._join(parts)
+
+    def _iter_nodes(self, selected=None):
+        """Yield the results (among the `selected` nodes, if given) in insertion order."""
+        parents = self._parents
+        names = self._names
+        groups = self._groups
+        verbatim = self._verbatim
+        last_parent, parent_path = None, None
+        i = -1  # the index of the result, into `groups`
+        for node, is_result in enumerate(self._is_result):
+            if not is_result:
+                continue
+            i += 1
+            if selected is not None and not selected[node]:
+                continue
+            if node in verbatim:
+                path = verbatim[node]
+            else:
+                parent = parents[node]
+                if parent != last_parent:
+                    last_parent = parent
+                    parent_path = self._path(parent) if parent >= 0 else None
+                name = names[node]
+                if parent_path is None:
+                    path = self._join([name])
+                else:
+                    path = self._join([parent_path, name])
+            if groups is None:
+                yield path
+            else:
+                yield path, groups[i]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return self._iter_nodes()
+
+    def __repr__(self):
+        return '<%s of %i paths>' % (type(self).__name__, len(self))
+
+    def _find(self, path):
+        """Return the nodes matching `path` (a trailing slash ignored), component-wise."""
+        head, tail = os.path.split(path)
+        if not tail:
+            if head and head != path:
+                return self._find(head)  # a trailing slash
+            node = self._find_dir(path)  # the root, or a drive
+            return [] if node is None else [node]
+        parent = self._find_dir(head)
+        return [] if parent is None else self._children_named(parent, tail)
+
+    def __contains__(self, path):
+        head, tail = os.path.split(path)
+        if tail:
+            nodes = self._find(path)
+        else:
+            # Results of patterns ending with a slash are `''` names
+            # in their directory.
+            parent = self._find_dir(head)
+            nodes = [] if parent is None else self._children_named(parent, tail)
+        return any(self._is_result[node] for node in nodes)
+
+    def iter_prefix(self, prefix):
+        """Yield the results equal to or under the `prefix` directory."""
+        marked = bytearray(len(self._names))
+        for node in self._find(prefix):
+            marked[node] = 1
+        parents = self._parents
+        # Parents are always appended before their children.
+        for node in range(len(marked)):
+            parent = parents[node]
+            if parent >= 0 and marked[parent]:
+                marked[node] = 1
+        return self._iter_nodes(marked)
+
+
+class GlobStats(object):
+    """Counters & timings of the work done by a :class:`Globber`, given as its ``stats``.
+
+    :ivar calls:
+        a dict with the number of calls to each filesystem method
+        (``listdir``, ``isdir``, ``islink``, ``exists``)
+    :ivar entries_scanned:
+        directory entries checked by :meth:`Globber.filter`
+    :ivar entries_matched:
+        directory entries matched by :meth:`Globber.filter`
+    :ivar cache_hits, cache_misses:
+        lookups of compiled patterns (counted from the process-wide cache,
+        so concurrent globs in other threads are counted too)
+    :ivar times:
+        a dict with the seconds spent in each phase: ``listdir``,
+        ``stat`` (isdir/islink/exists), ``filter``, and ``total``
+        (inside :meth:`Globber.iglob`, excluding the consumer's time)
+    """
+
+    def __init__(self):
+        self.calls = dict.fromkeys(('listdir', 'isdir', 'islink', 'exists'), 0)
+        self.entries_scanned = 0
+        self.entries_matched = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.times = dict.fromkeys(('listdir', 'stat', 'filter', 'total'), 0.0)
+
+    @property
+    def dir_reads(self):
+        return self.calls['listdir']
+
+    @property
+    def stat_calls(self):
+        return self.calls['isdir'] + self.calls['islink'] + self.calls['exists']
+
+    def as_dict(self):
+        """Return all counters as a flat dict, e.g. for a metrics pipeline."""
+        d = {
+            'dir_reads': self.dir_reads,
+            'stat_calls': self.stat_calls,
+            'entries_scanned': self.entries_scanned,
+            'entries_matched': self.entries_matched,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+        d.update(('calls_%s' % k, v) for k, v in self.calls.items())
+        d.update(('time_%s' % k, v) for k, v in self.times.items())
+        return d
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+            '%s=%r' % kv for kv in sorted(self.as_dict().items())))
+
+    def _counting(self, name, func):
+        calls = self.calls
+        times = self.times
+        phase = 'listdir' if name == 'listdir' else 'stat'
+
+        def counting(path):
+            calls[name] += 1
+            start = _timer()
+            try:
+                return func(path)
+            finally:
+                times[phase] += _timer() - start
+        return counting
+
+    def _counting_filter(self, func):
+        def counting_filter(names, *args):
+            if not isinstance(names, list):
+                names = list(names)
+            info = _compile_pattern.cache_info()
+            start = _timer()
+            result = func(names, *args)
+            self.times['filter'] += _timer() - start
+            new_info = _compile_pattern.cache_info()
+            self.cache_hits += new_info.hits - info.hits
+            self.cache_misses += new_info.misses - info.misses
+            self.entries_scanned += len(names)
+            self.entries_matched += len(result)
+            return result
+        return counting_filter
+
+    def _timing(self, results, callback):
+        times = self.times
+        start = _timer()
+        try:
+            for x in results:
+                times['total'] += _timer() - start
+                yield x
+                start = _timer()
+            times['total'] += _timer() - start
+        finally:
+            if callback:
+                callback(self)
+
+
 class Globber(object):
     """
     :ivar with_matches:
@@ -98,17 +448,32 @@ class Globber(object):
     :ivar norm_paths:
         when true, invokes `os.path,.normcase()` on both paths.
 
-        Note that a side-effect of `normcase()` on *Windows* is that
-        it converts to lower-case all matches of `?glob()` functions.
+        Matches are still captured from the original names,
+        so `normcase()` does not lower-case them on *Windows*.
     :ivar case_sensitive:
         defines the case-sensitiviness of regex doing the matches
     :ivar sep:
         If given, all (back)slahes are replaced with ``os.sep`` (if True),
         or the given char.
-
-    Notice that if `normcase()` is used to achieve case-insensitivity,
-    on Windows, it side-eefects switching the case of captured matches!
-    So prefer using ``case_insensitive=False``.
+    :ivar sort:
+        When true, results are streamed sorted path-component by
+        path-component (so ``a/b`` comes before ``a-b``); if a callable,
+        it is used as the sort-key of each component (e.g. :func:`natural_key`),
+        ties broken by the names.  Only directory listings are sorted, and ``**`` is walked depth-first,
+        so memory stays bounded by the listings of the directories being
+        visited, not by the number of results.
+    :ivar stats:
+        A :class:`GlobStats` (or true, to create one) collecting counters
+        of the filesystem calls, the matching and their timings;
+        when not given, nothing is instrumented.
+    :ivar stats_callback:
+        If given, called with the ``stats`` whenever an :meth:`iglob`
+        is exhausted or closed (implies ``stats``).
+    :ivar listing_cache:
+        A dict (e.g. ``{}``, possibly shared by many Globbers) to keep
+        the directory listings in, along with their names normalized
+        for matching, so they are read & normalized once for all patterns
+        and globs using it.  It is never invalidated.
     """
 
     listdir = staticmethod(os.listdir)
@@ -122,9 +487,17 @@ class Globber(object):
             return path
         if sep is True:
             sep = os.sep
-        if not PY2 and isinstance(path, bytes):
-            return re.sub(br'[\\/]', sep.encoce('ASCII'), path)
-        return re.sub(r'[\\/]', sep, path)
+        if isinstance(path, bytes):
+            if not isinstance(sep, bytes):
+                sep = sep.encode('ASCII')
+            slashes = (b'/', b'\\')
+        else:
+            slashes = ('/', '\\')
+        # Scanning is cheaper than replacing, and mostly finds nothing.
+        for slash in slashes:
+            if slash != sep and slash in path:
+                path = path.replace(slash, sep)
+        return path
 
     def _join_paths(self, paths):
         path = join(*paths)
@@ -159,22 +532,96 @@ class Globber(object):
     norm_paths = None
     case_sensitive = (os.name != 'nt')
     sep = None
+    sort = False
+    stats = None
+    stats_callback = None
+    listing_cache = None
 
     def __init__(self, **kw):
         vars(self).update(**kw)
+        if self.stats or self.stats_callback:
+            self._instrument()
+
+    def _instrument(self):
+        """Shadow the filesystem methods & filter with counting ones, only when asked."""
+        if not isinstance(self.stats, GlobStats):
+            self.stats = GlobStats()
+        for name in ('listdir', 'isdir', 'islink', 'exists'):
+            setattr(self, name, self.stats._counting(name, getattr(self, name)))
+        # Count a subclass's filter() alone, even if it calls ours.
+        name = 'filter' if self._overrides_filter() else '_filter_keys'
+        setattr(self, name, self.stats._counting_filter(getattr(self, name)))
+
+    def _overrides_filter(self):
+        func, ours = type(self).filter, Globber.filter
+        return getattr(func, '__func__', func) is not getattr(ours, '__func__', ours)
 
     def filter(self, names, pat):
         """Return the subset of the list NAMES that match PAT."""
+        if not isinstance(names, list):
+            names = list(names)
+        return self._filter_keys(names, self._norm_names(names), pat)
+
+    def _filter_keys(self, names, keys, pat):
+        """Like :meth:`filter`, matching the `keys` of the `names`, by :meth:`_norm_names`."""
+        match = _compile_pattern(self._norm_paths(pat), self.case_sensitive)
         result = []
-        pat = self._norm_paths(pat)
-        match = _compile_pattern(pat, self.case_sensitive)
-        for name in names:
-            m = match(self._norm_paths(name))
+        if keys is names:
+            for name in names:
+                m = match(name)
+                if m:
+                    result.append((name, m.groups()))
+            return result
+
+        group_ids = range(1, match.__self__.groups + 1)
+        for name, key in zip(names, keys):
+            m = match(key)
             if m:
-                result.append((name,
-                               tuple(self._norm_paths(p) for p in m.groups())))
+                groups = m.groups()
+                if key != name:
+                    name_key = self._sub_sep(name)
+                    if len(key) != len(name_key):
+                        # normcase() changed the length: match the name itself.
+                        match_name = _compile_pattern(self._sub_sep(pat), False)
+                        groups = (match_name(name_key) or m).groups()
+                    else:
+                        # Report the matches with their original case.
+                        groups = tuple([name_key[slice(*m.span(i))]
+                                        for i in group_ids])
+                result.append((name, groups))
         return result
 
+    def _norm_names(self, names):
+        """Return the keys the list of `names` are matched by, or `names` if the same.
+
+        Keys are normalized as asked by ``norm_paths`` & ``sep``.
+        """
+        keys = names
+        if self.norm_paths:
+            keys = [os.path.normcase(k) for k in keys]
+        if self.sep is not None:
+            keys = [self._sub_sep(k) for k in keys]
+        return keys
+
+    def _listdir_keys(self, dirname):
+        """Return the names in `dirname` and their keys, reusing ``listing_cache``, if given."""
+        cache = self.listing_cache
+        entry = cache.get(dirname) if cache is not None else None
+        if entry is None:
+            names = self.listdir(dirname)
+            if not isinstance(names, list):
+                names = list(names)
+            entry = (names, {})
+            if cache is not None:
+                cache[dirname] = entry
+
+        names, normalized = entry
+        options = (self.norm_paths, self.sep)
+        keys = normalized.get(options)
+        if keys is None:
+            keys = normalized[options] = self._norm_names(names)
+        return names, keys
+
     def fnmatchcase(self, name, pat):
         """Test whether FILENAME matches PATTERN, including case.
 
@@ -208,16 +655,32 @@ class Globber(object):
 
         return self.fnmatchcase(name, pat)
 
-    def glob(self, pathname):
+    def glob(self, pathname, as_tree=False):
         """Return a list of paths matching a pathname pattern.
 
         :param pathname:
             A string/byte pattern that may contain
             simple shell-style wildcards a la fnmatch.
+        :param as_tree:
+            if true, return a :class:`PathTree` sharing the common
+            directory prefixes of the results, instead of a list.
         :return:
             strings or bytes, depending on the `patterns
         """
-        return list(self.iglob(pathname))
+        if not as_tree:
+            return list(self.iglob(pathname))
+
+        if not has_magic(pathname):
+            parts = [(None, pathname, ())] if self.exists(pathname) else []
+        else:
+            parts = self._iglob_parts(pathname, True)
+        if self.stats is not None:
+            parts = self.stats._timing(parts, self.stats_callback)
+
+        tree = PathTree(self._join_paths, self.with_matches)
+        for dirname, name, groups in parts:
+            tree.add(dirname, name, groups)
+        return tree
 
     def iglob(self, pathname):
         """Return an iterator yielding the paths matching a pathname pattern.
@@ -234,6 +697,8 @@ class Globber(object):
         wildcards.
         """
         result = self._iglob(pathname, True)
+        if self.stats is not None:
+            result = self.stats._timing(result, self.stats_callback)
         if self.with_matches:
             return result
         return imap(lambda s: s[0], result)
@@ -257,6 +722,28 @@ class Globber(object):
                 yield pathname, ()
             return
 
+        join_paths = _join_parts if self.sep is None else self._join_paths
+        for dirname, name, groups in self._iglob_parts(pathname, rootcall):
+            yield join_paths([dirname, name]), groups
+
+    def _iglob_parts(self, pathname, rootcall):
+        """Like :meth:`_iglob` for magic `pathname`, but yield unjoined ``(dirname, name, groups)``."""
+
+        # Consecutive literal components following the last wildcard
+        # (``*/2026/10/data.csv``) are resolved together, with a single probe
+        # per directory found; and none at all for the dirname of a deeper
+        # call, as the listing of the next level will fail anyway.
+        head, literal = _split_literal(pathname)
+        if literal:
+            dirs = self._iglob(head, False)
+            if not rootcall:
+                resolve = lambda dirname: [(literal, ())]
+            else:
+                resolve = lambda dirname: self._resolve_literal(dirname, literal)
+            for x in self._resolve_dirs(dirs, resolve):
+                yield x
+            return
+
         # If no directory part is left, assume the working directory
         dirname, basename = os.path.split(pathname)
 
@@ -274,10 +761,133 @@ class Globber(object):
         else:
             dirs = [(dirname, ())]
 
-        # Resolve ``basename`` expr for every directory found
+        resolve = lambda dirname: self.resolve_pattern(dirname, basename,
+                                                       not rootcall)
+        # The matches of ``**`` are streamed already sorted.
+        presorted = basename in ('**', b'**')
+        for x in self._resolve_dirs(dirs, resolve, presorted):
+            yield x
+
+    def _resolve_literal(self, dirname, literal):
+        """Probe whether the `literal` path exists in `dirname` (or is a directory, if it ends with a slash)."""
+        path = self._join_paths([dirname, literal])
+        if _split_path(literal[-1:]):
+            found = self.exists(path)
+        else:
+            found = self.isdir(path)
+        return [(literal, ())] if found else []
+
+    def _resolve_dirs(self, dirs, resolve, presorted=False):
+        """Yield ``(dirname, name, groups)`` for all names `resolve(dirname)` finds in `dirs`.
+
+        :param presorted:
+            whether `resolve` returns its names already in sort-order
+        """
+        if self.sort:
+            for x in self._iglob_sorted(dirs, resolve, presorted):
+                yield x
+            return
+
         for dirname, dir_groups in dirs:
-            for name, groups in self.resolve_pattern(dirname, basename, not rootcall):
-                yield self._join_paths([dirname, name]), dir_groups + groups
+            for name, groups in resolve(dirname):
+                yield dirname, name, dir_groups + groups
+
+    def _sort_key(self, path):
+        """Return the key ordering `path` component-wise, as defined by ``sort``."""
+        if not callable(self.sort):
+            return tuple(_split_path(path))
+        # Names of equal keys (``f1`` & ``f01``) are ordered by themselves,
+        # not to depend on the listing order.
+        key = self.sort
+        return tuple((key(p), p) for p in _split_path(path))
+
+    def _iglob_sorted(self, dirs, resolve, presorted=False):
+        """Like :meth:`_resolve_dirs` for the sorted `dirs`, yielding matches in sort-order.
+
+        The matches of each directory are sorted (or streamed already sorted,
+        for ``**``), and merged through a heap holding the next match
+        of each directory.  Any match under some directory sorts after it,
+        so when the next directory arrives, every pending match not sorting
+        after it can be safely emitted; what remains pending are only
+        the matches of its ancestors (found with ``**`` in the dirname).
+        """
+        pending = []
+        # `seq` identifies the single entry of each directory in the heap,
+        # and breaks ties, so that paths & groups are never compared.
+        for seq, (dirname, dir_groups) in enumerate(dirs):
+            dir_key = self._sort_key(dirname)
+            while pending and pending[0][0] <= dir_key:
+                yield self._pop_sorted(pending)
+            results = resolve(dirname)
+            if not presorted:
+                results = sorted(results, key=lambda r: self._sort_key(r[0]))
+            self._push_sorted(pending, seq, dirname, dir_key, dir_groups,
+                              iter(results))
+        while pending:
+            yield self._pop_sorted(pending)
+
+    def _push_sorted(self, pending, seq, dirname, dir_key, dir_groups, results):
+        for name, groups in results:
+            heapq.heappush(pending, (dir_key + self._sort_key(name), seq,
+                                     dirname, dir_key, dir_groups,
+                                     name, groups, results))
+            break
+
+    def _pop_sorted(self, pending):
+        (_, seq, dirname, dir_key, dir_groups,
+         name, groups, results) = heapq.heappop(pending)
+        self._push_sorted(pending, seq, dirname, dir_key, dir_groups, results)
+        return dirname, name, dir_groups + groups
+
+    def _iglobstar(self, dirname, pattern, globstar_with_root):
+        """Like :meth:`resolve_pattern` for ``**``, streaming the subtree listing by listing."""
+        # Reset pattern so that fnmatch(), which does not understand
+        # ** specifically, will only return a single group match.
+        star = pattern[:1]
+        if globstar_with_root:
+            # Include the current directory in **, if asked; by adding
+            # an empty string as opposed to '.', we spare ourselves
+            # having to deal with os.path.normpath() later.
+            for x in self.filter([pattern[:0]], star):
+                yield x
+        for top, entries in self.walk(dirname):
+            top = top[len(dirname) + 1:]
+            names = [self._join_paths([top, s]) for s in entries]
+            if not self.include_hidden:
+                names = [x for x in names if not _ishidden(x)]
+            for x in self.filter(names, star):
+                yield x
+
+    def _iglobstar_sorted(self, dirname, pattern, globstar_with_root):
+        """Like :meth:`resolve_pattern` for ``**``, streaming the subtree in sort-order.
+
+        Each listing is sorted and visited depth-first, so only the listings
+        of the directories being visited are held in memory.
+        """
+        if globstar_with_root:
+            yield pattern[:0], (pattern[:0],)
+        for x in self._walk_sorted(dirname, dirname, pattern[:0], pattern[:1]):
+            yield x
+
+    def _walk_sorted(self, root, top, rel, star):
+        try:
+            names = self.listdir(top)
+        except os.error:
+            return
+        if not rel and not self.include_hidden:
+            # Like resolve_pattern(), hide the hidden entries of `root` only
+            # (and everything under them).
+            names = [n for n in names if not _ishidden(n)]
+        names = sorted((self._join_paths([rel, n]) for n in names),
+                       key=self._sort_key)
+        matches = dict(self.filter(names, star))
+        for name in names:
+            if name in matches:
+                yield name, matches[name]
+            path = self._join_paths([root, name])
+            if self.followlinks or not self.islink(path):
+                for x in self._walk_sorted(root, path, name, star):
+                    yield x
 
     def resolve_pattern(self, dirname, pattern, globstar_with_root):
         """Apply `pattern` (contains no path elements) to the literal directory in `dirname`.
@@ -310,38 +920,43 @@ class Globber(object):
 
         if not dirname:
             dirname = os.curdir
+            if not PY2 and isinstance(pattern, bytes):
+                dirname = dirname.encode('ASCII')
+
+        if pattern in ('**', b'**'):
+            if self.sort:
+                return self._iglobstar_sorted(dirname, pattern,
+                                              globstar_with_root)
+            return self._iglobstar(dirname, pattern, globstar_with_root)
 
         try:
-            if pattern == '**':
-                # Include the current directory in **, if asked; by adding
-                # an empty string as opposed to '.', we spare ourselves
-                # having to deal with os.path.normpath() later.
-                names = [''] if globstar_with_root else []
-                for top, entries in self.walk(dirname):
-                    _mkabs = lambda s: self._join_paths([top[len(dirname) + 1:], s])
-                    names.extend(map(_mkabs, entries))
-                # Reset pattern so that fnmatch(), which does not understand
-                # ** specifically, will only return a single group match.
-                pattern = '*'
-            else:
-                names = self.listdir(dirname)
+            names, keys = self._listdir_keys(dirname)
         except os.error:
             return []
 
         if not self.include_hidden and not _ishidden(pattern):
-            # Remove hidden files, but take care to ensure
-            # that the empty string we may have added earlier remains.
-            # Do not filter out the '' that we might have added earlier
-            names = filter(lambda x: not x or not _ishidden(x), names)
-        return self.filter(names, pattern)
+            # Remove hidden files.
+            if keys is names:
+                names = keys = [x for x in names if not _ishidden(x)]
+            else:
+                visible = [(x, k) for x, k in zip(names, keys)
+                           if not _ishidden(x)]
+                names = [x for x, _ in visible]
+                keys = [k for _, k in visible]
+        if self._overrides_filter():
+            return self.filter(names, pattern)
+        return self._filter_keys(names, keys, pattern)
 
 
-def glob(pathname, **kw):
+def glob(pathname, as_tree=False, **kw):
     """Return a list of paths matching a pathname pattern.
 
     :param pathname:
         A string/byte pattern that may contain
         simple shell-style wildcards a la fnmatch.
+    :param as_tree:
+        if true, return a :class:`PathTree` sharing the common
+        directory prefixes of the results, instead of a list.
     :param with_matches:
         if true, then for each matching path a 2-tuple will be returned;
         the second element if the tuple will be a list of the parts
@@ -354,22 +969,26 @@ def glob(pathname, **kw):
     :param norm_paths:
         when true, invokes `os.path,.normcase()` on both paths.
 
-        Note that a side-effect of `normcase()` on *Windows* is that
-        it converts to lower-case all matches of `?glob()` functions.
+        Matches are still captured from the original names,
+        so `normcase()` does not lower-case them on *Windows*.
     :param case_sensitive:
         defines the case-sensitiviness of regex doing the matches
     :param sep:
         If given, all (back)slahes are replaced with ``os.sep`` (if True),
         or the given char.
+    :param sort:
+        When true, results are returned sorted path-component by
+        path-component; if a callable, it is used as the sort-key
+        of each component (e.g. :func:`natural_key`).
+    :param stats:
+        A :class:`GlobStats` collecting counters & timings of the work done.
+    :param stats_callback:
+        Called with the :class:`GlobStats` when globbing has finished.
 
     :return:
         strings or bytes, depending on the `patterns
-
-    Notice that if `normcase()` is used to achieve case-insesitivity,
-    on Windows, it side-eefects switching the case of captured matches!
-    So prefer using ``case_insensitive=False``.
     """
-    return list(iglob(pathname, **kw))
+    return Globber(**kw).glob(pathname, as_tree)
 
 def iglob(pathname, **kw):
     """Return an iterator yielding the paths matching a pathname pattern.
@@ -389,19 +1008,23 @@ def iglob(pathname, **kw):
     :param norm_paths:
         when true, invokes `os.path,.normcase()` on both paths.
 
-        Note that a side-effect of `normcase()` on *Windows* is that
-        it converts to lower-case all matches of `?glob()` functions.
+        Matches are still captured from the original names,
+        so `normcase()` does not lower-case them on *Windows*.
     :param case_sensitive:
         defines the case-sensitiviness of regex doing the matches
     :param sep:
         If given, all (back)slahes are replaced with ``os.sep`` (if True),
         or the given char.
+    :param sort:
+        When true, results are returned sorted path-component by
+        path-component; if a callable, it is used as the sort-key
+        of each component (e.g. :func:`natural_key`).
+    :param stats:
+        A :class:`GlobStats` collecting counters & timings of the work done.
+    :param stats_callback:
+        Called with the :class:`GlobStats` when globbing has finished.
 
     :return:
         a generator of strings or bytes, depending on the `patterns
-
-    Notice that if `normcase()` is used to achieve case-insesitivity,
-    on Windows, it side-eefects switching the case of captured matches!
-    So prefer using ``case_insensitive=False``.
     """
     return Globber(**kw).iglob(pathname)
@@ -42,7 +42,10 @@ setup(
         'Programming Language :: Python :: 3',
         'Topic :: Software Development :: Libraries',
         ],
-    packages = find_packages(exclude=['tests']),
+    packages = find_packages(exclude=['tests', 'benchmarks']),
+    entry_points={
+        'console_scripts': ['glob2 = glob2.__main__:main'],
+    },
     extras_require={
         'test': test_requirements,
     },
@@ -0,0 +1,30 @@
+import json
+import sys
+
+import pytest
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5),
+                    reason="stdlib glob is recursive since Python 3.5")
+def test_run_smoke(tmpdir):
+    from benchmarks.run import ENGINES, main, run
+
+    records = list(run(str(tmpdir), ['wide', 'hidden'], sorted(ENGINES),
+                       ['*/*', '**'], scale=0.01, repeat=1))
+    assert len(records) == 2 * len(ENGINES) * 2
+    for record in records:
+        assert record['wall_time'] >= 0 and record['peak_memory'] > 0
+        assert sum(record['calls'].values()) > 0
+        if record['engine'].startswith('glob2') or record['shape'] == 'wide':
+            assert record['comparable'], record
+    # pathlib matches hidden files, glob2 does not.
+    hidden, = [r for r in records if r['shape'] == 'hidden'
+               and r['pattern'] == '**' and r['engine'] == 'pathlib']
+    assert not hidden['comparable']
+
+    out = tmpdir.join('out.jsonl')
+    main(['--root', str(tmpdir), '--shapes', 'wide', '--engines', 'glob2',
+          '--pattern', '**', '--scale', '0.01', '--repeat', '1',
+          '-o', str(out)])
+    record, = [json.loads(line) for line in out.readlines()]
+    assert record['results'] == 4 + 1 + 4  # files, a dir & its files
@@ -3,6 +3,8 @@ from os import path
 import shutil
 import tempfile
 
+import pytest
+
 import glob2
 
 # Sep='/' so assertions works also on Windows.
@@ -47,7 +49,7 @@ class TestFnmatch(object):
 
 class BaseTest(object):
 
-    def setup(self):
+    def setup_method(self):
         self.basedir = tempfile.mkdtemp()
         self._old_cwd = os.getcwd()
         os.chdir(self.basedir)
@@ -57,7 +59,7 @@ class BaseTest(object):
     def setup_files(self):
         pass
 
-    def teardown(self):
+    def teardown_method(self):
         os.chdir(self._old_cwd)
         shutil.rmtree(self.basedir)
 
@@ -173,3 +175,330 @@ class TestIncludeHidden(BaseTest):
             ('b/.bar', ('b', '.bar')),
             ('b/py', ('b', 'py')),
         ]
+
+
+class TestSort(BaseTest):
+
+    def setup_files(self):
+        self.makedirs('a', 'a/foo', 'a-b', 'b10', 'b2')
+        self.touch('z.py', 'a.py', 'a/x.py', 'a/foo/y.py', 'a-b/c.py',
+                   'b10/d.py', 'b2/e.py', 'b2/f10.py', 'b2/f9.py')
+
+    def test_sorted_componentwise(self):
+        assert glob2.glob('**/*.py', sort=True, sep='/') == [
+            'a/foo/y.py',
+            'a/x.py',
+            'a-b/c.py',
+            'a.py',
+            'b10/d.py',
+            'b2/e.py',
+            'b2/f10.py',
+            'b2/f9.py',
+            'z.py',
+        ]
+
+    def test_sorted_matches(self):
+        assert glob2.glob('b*/*.py', with_matches=True, sort=True, sep='/') == [
+            ('b10/d.py', ('10', 'd')),
+            ('b2/e.py', ('2', 'e')),
+            ('b2/f10.py', ('2', 'f10')),
+            ('b2/f9.py', ('2', 'f9')),
+        ]
+
+    def test_sorted_globstar_basename(self):
+        assert glob2.glob('a/**', sort=True, sep='/') == [
+            'a/foo', 'a/foo/y.py', 'a/x.py']
+
+    def test_globstar_streamed(self):
+        # Results of ** stream out while walking depth-first, reading only
+        # the listings of the directories being visited.
+        stats = glob2.GlobStats()
+        results = glob2.iglob('**', sort=True, sep='/', stats=stats)
+        assert next(results) == 'a'
+        assert stats.dir_reads == 2  # '.', and 'a' to look-ahead
+        assert next(results) == 'a/foo'
+        assert stats.dir_reads == 3
+        assert list(results)[-1] == 'z.py'
+        assert stats.dir_reads == 1 + 14
+
+    def test_natural_key(self):
+        assert glob2.glob('b*/*.py', sort=glob2.natural_key, sep='/') == [
+            'b2/e.py',
+            'b2/f9.py',
+            'b2/f10.py',
+            'b10/d.py',
+        ]
+
+    def test_natural_key_ties(self):
+        # Names of equal keys sort the same, whatever the listing order.
+        for names in (['f1', 'f01', 'f001'], ['f001', 'f01', 'f1']):
+            globber = glob2.Globber(sort=glob2.natural_key)
+            globber.listdir = lambda dirname, names=names: list(names)
+            assert globber.glob('f*') == ['f001', 'f01', 'f1']
+
+    def test_subclass_filter_sorted(self):
+        class Globber(glob2.Globber):
+            def filter(self, names, pat):
+                return (x for x in super(Globber, self).filter(names, pat))
+
+        assert Globber(sort=True, sep='/').glob('b*/*') == [
+            'b10/d.py', 'b2/e.py', 'b2/f10.py', 'b2/f9.py']
+        assert Globber(sort=True, sep='/').glob('a/**') == [
+            'a/foo', 'a/foo/y.py', 'a/x.py']
+
+
+class TestPathTree(BaseTest):
+
+    def setup_files(self):
+        self.makedirs('a', 'a/foo', 'a-b', 'b')
+        self.touch('file.py', 'a/bar.py', 'a/foo/hello.py', 'a-b/x.py',
+                   'b/bar.py', 'b/py')
+
+    def test_same_as_list(self):
+        for pattern in ('**/*.py', '*/*.py', '**', 'a/**', '**/', 'file.py'):
+            tree = glob2.glob(pattern, as_tree=True, sep='/')
+            assert list(tree) == glob2.glob(pattern, sep='/')
+            assert len(tree) == len(glob2.glob(pattern))
+
+    def test_with_matches(self):
+        tree = glob2.glob('**/*.py', with_matches=True, as_tree=True, sep='/')
+        assert list(tree) == g.glob('**/*.py')
+
+    def test_contains(self):
+        tree = glob2.glob('**/*.py', as_tree=True)
+        assert 'a/foo/hello.py' in tree
+        assert 'file.py' in tree
+        assert 'a/foo' not in tree
+        assert 'b/py' not in tree
+        assert 'nothing/here' not in tree
+
+    def test_contains_trailing_slash(self):
+        for pattern in ('*/', '**/', 'b/', 'a/**/'):
+            tree = glob2.glob(pattern, as_tree=True)
+            assert len(tree) and all(p in tree for p in tree)
+        tree = glob2.glob('*/', as_tree=True, sep='/')
+        assert 'a/' in tree
+        assert 'a' not in tree
+        assert 'a/foo/' not in tree
+
+    def test_prefix(self):
+        tree = glob2.glob('**', as_tree=True, sep='/')
+        assert sorted(tree.iter_prefix('a')) == [
+            'a', 'a/bar.py', 'a/foo', 'a/foo/hello.py']
+        assert sorted(tree.iter_prefix('a/foo/')) == [
+            'a/foo', 'a/foo/hello.py']
+        assert list(tree.iter_prefix('c')) == []
+
+    def test_non_magic_verbatim(self):
+        for pattern in ('a//foo/hello.py', 'a/./bar.py', 'b/'):
+            tree = glob2.glob(pattern, as_tree=True)
+            assert list(tree) == glob2.glob(pattern) == [pattern]
+
+    def test_smaller_than_list(self):
+        tracemalloc = pytest.importorskip('tracemalloc')
+        deep = path.join(*['directory%02d' % i for i in range(8)])
+        for sub in ('x', 'y'):
+            self.makedirs(path.join(deep, sub))
+            self.touch(*[path.join(deep, sub, 'result%04d.txt' % i)
+                         for i in range(500)])
+        pattern = path.join(self.basedir, deep, '*', '*.txt')
+
+        def retained(as_tree):
+            tracemalloc.start()
+            try:
+                result = glob2.glob(pattern, as_tree=as_tree)
+                if as_tree:
+                    # Queries must not inflate it either.
+                    assert path.join(self.basedir, deep, 'x') not in result
+                    assert len(list(result.iter_prefix(
+                        path.join(self.basedir, deep, 'y')))) == 500
+                return len(result), tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+        tree_len, tree_size = retained(True)
+        list_len, list_size = retained(False)
+        assert tree_len == list_len == 1000
+        assert tree_size < list_size * 3 / 4
+
+
+class TestStats(BaseTest):
+
+    def setup_files(self):
+        self.makedirs('a', 'b', 'a/foo')
+        self.touch('file.py', 'file.txt', 'a/bar.py', 'b/bar.py',
+                   'a/foo/hello.py')
+
+    def test_counters(self):
+        stats = glob2.GlobStats()
+        assert sorted(glob2.glob('*/*.py', stats=stats)) == [
+            'a/bar.py', 'b/bar.py']
+        # '.', plus all its 4 entries, even files.
+        assert stats.dir_reads == stats.calls['listdir'] == 5
+        assert stats.entries_scanned == 4 + 2 + 1
+        assert stats.entries_matched == 4 + 1 + 1
+        assert stats.cache_hits + stats.cache_misses == 3
+        assert stats.times['total'] > 0
+        assert stats.as_dict()['dir_reads'] == 5
+
+    def test_stat_calls(self):
+        stats = glob2.GlobStats()
+        glob2.glob('**/', stats=stats)
+        assert stats.calls['islink'] == 8  # every entry walked
+        assert stats.calls['isdir'] == 9  # and '' for the root
+        assert stats.stat_calls == 17
+
+    def test_callback(self):
+        reported = []
+        glob2.glob('*.py', stats_callback=reported.append)
+        assert len(reported) == 1
+        assert reported[0].entries_matched == 1
+
+    def test_disabled(self):
+        globber = glob2.Globber()
+        assert globber.stats is None
+        assert globber.listdir is glob2.Globber.listdir
+
+
+class TestCli(BaseTest):
+
+    def setup_files(self):
+        self.makedirs('a', 'a/foo', 'b')
+        self.touch('file.py', '.hidden.py', 'a/bar.py', 'a/foo/hello.py',
+                   'a/foo/world.txt', 'b/bar.py')
+
+    def cli(self, capsysbinary, *argv):
+        from glob2.__main__ import main
+        assert main(list(argv)) == 0
+        return capsysbinary.readouterr()
+
+    def test_null_separated(self, capsysbinary):
+        out = self.cli(capsysbinary, '-0', '--sort', '**/*.py').out
+        assert out == b'a/bar.py\0a/foo/hello.py\0b/bar.py\0file.py\0'
+
+    def test_many_patterns_and_exclude(self, capsysbinary):
+        out = self.cli(capsysbinary, '*.py', 'a/**', '-x', 'bar.py',
+                       '-x', 'a/foo/*', '--hidden').out
+        assert sorted(out.splitlines()) == [b'.hidden.py', b'a/foo', b'file.py']
+
+    def test_limit(self, capsysbinary):
+        out = self.cli(capsysbinary, '--limit', '2', '**').out
+        assert len(out.splitlines()) == 2
+        assert self.cli(capsysbinary, '--limit', '0', '**').out == b''
+
+    def test_negative_limit(self, capsysbinary):
+        from glob2.__main__ import main
+        with pytest.raises(SystemExit) as exc:
+            main(['--limit=-1', '*'])
+        assert exc.value.code == 2
+        assert b'--limit: must not be negative' in capsysbinary.readouterr().err
+
+    def test_stats(self, capsysbinary):
+        captured = self.cli(capsysbinary, '--stats', '*/*.py')
+        assert len(captured.out.splitlines()) == 2
+        assert b'results: 2\n' in captured.err
+        assert b'dir_reads: ' in captured.err
+
+
+class TestLiteralSegments(BaseTest):
+
+    def setup_files(self):
+        self.makedirs('a/2026/10', 'b/2026/10', 'c/2026', 'd')
+        self.touch('a/2026/10/x.csv', 'b/2026/10/y.csv', 'c/2026/10')
+
+    def test_single_probe(self):
+        stats = glob2.GlobStats()
+        assert sorted(glob2.glob('*/2026/10/x.csv', stats=stats)) == [
+            'a/2026/10/x.csv']
+        assert stats.calls == {
+            'listdir': 1, 'exists': 4, 'isdir': 0, 'islink': 0}
+
+    def test_no_probe_before_listing(self):
+        stats = glob2.GlobStats()
+        assert sorted(glob2.glob('*/2026/10/*.csv', with_matches=True,
+                                 stats=stats)) == [
+            ('a/2026/10/x.csv', ('a', 'x')),
+            ('b/2026/10/y.csv', ('b', 'y')),
+        ]
+        assert stats.calls['exists'] == 0
+        assert stats.calls['listdir'] == 1 + 4
+
+    def test_trailing_slash(self):
+        assert sorted(glob2.glob('*/2026/10/')) == [
+            'a/2026/10/', 'b/2026/10/']
+        assert sorted(glob2.glob('*/2026/10')) == [
+            'a/2026/10', 'b/2026/10', 'c/2026/10']
+
+
+class TestSep(object):
+
+    def test_sub_sep(self):
+        assert glob2.Globber(sep='/')._sub_sep('a\\b/c') == 'a/b/c'
+        assert glob2.Globber(sep='\\')._sub_sep('a\\b/c') == 'a\\b\\c'
+        assert glob2.Globber(sep='/')._sub_sep(b'a\\b/c') == b'a/b/c'
+        assert glob2.Globber()._sub_sep('a\\b/c') == 'a\\b/c'
+
+
+class TestCaseInsensitive(BaseTest):
+
+    def setup_files(self):
+        self.makedirs('Media', 'media2')
+        self.touch('Media/Song.MP3', 'Media/clip.mp4', 'media2/OTHER.mp3')
+
+    def test_matches_keep_case(self):
+        assert sorted(glob2.glob('m*/*.mp3', with_matches=True,
+                                 case_sensitive=False, sep='/')) == [
+            ('Media/Song.MP3', ('edia', 'Song')),
+            ('media2/OTHER.mp3', ('edia2', 'OTHER')),
+        ]
+        assert glob2.Globber(case_sensitive=False).filter(
+            ['Song.MP3', 'clip.mp4'], 'S*.mp3') == [('Song.MP3', ('ong',))]
+
+    def test_ranges(self):
+        globber = glob2.Globber(case_sensitive=False)
+        assert globber.filter(['B', 'z', '~'], '[A-_]*') == [
+            ('B', ('B', '')), ('z', ('z', ''))]
+        assert globber.filter(['B', 'z', '~'], '[Z-a]*') == [
+            ('z', ('z', ''))]
+        # Agreeing with fnmatch(), as used by the command-line --exclude.
+        for name in ('B', 'z', '~'):
+            for pat in ('[A-_]*', '[Z-a]*'):
+                assert globber.fnmatch(name, pat) == bool(
+                    globber.filter([name], pat))
+
+    def test_norm_paths_length(self):
+        # As normcase() lower-cases on Windows, changing lengths.
+        globber = glob2.Globber(case_sensitive=False, norm_paths=True)
+        assert globber._filter_keys(
+            [u'\u0130AB.txt'], [u'\u0130AB.txt'.lower()], '*b.txt') == [
+            (u'\u0130AB.txt', (u'\u0130A',))]
+
+    def test_subclass_filter(self):
+        class Globber(glob2.Globber):
+            def filter(self, names, pat):
+                return [(n, g) for n, g in super(Globber, self).filter(names, pat)
+                        if n != 'clip.mp4']
+
+        for kw in ({}, {'stats': True}, {'listing_cache': {}}):
+            globber = Globber(case_sensitive=False, sep='/', **kw)
+            assert sorted(globber.glob('*/*.mp*')) == [
+                'Media/Song.MP3', 'media2/OTHER.mp3']
+        assert globber.stats is None
+        assert Globber(stats=True).filter(['a', 'b'], 'a') == [('a', ())]
+
+    def test_listing_cache(self):
+        cache = {}
+        stats = glob2.GlobStats()
+        globber = glob2.Globber(case_sensitive=False, listing_cache=cache,
+                                stats=stats, sep='/')
+        assert globber.glob('Media/*.mp3') == ['Media/Song.MP3']
+        assert globber.glob('Media/*.MP4') == ['Media/clip.mp4']
+        assert stats.dir_reads == 1
+        names, normalized = cache['Media']
+        assert sorted(names) == ['Song.MP3', 'clip.mp4']
+        assert sorted(normalized[(None, '/')]) == ['Song.MP3', 'clip.mp4']
+
+        # Shared by globbers with other options too, normalized separately.
+        globber = glob2.Globber(case_sensitive=True, listing_cache=cache)
+        assert globber.glob('Media/*.mp3') == []
+        assert len(normalized) == 2